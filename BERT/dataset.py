@@ -2,6 +2,7 @@ import os
 import re
 import html
 import torch
+import torch.nn as nn
 import librosa
 import logging
 import pandas as pd
@@ -9,7 +10,8 @@ import numpy as np
 from model import load_bert
 from torchaudio.transforms import MFCC
 from KoBERT.tokenization import BertTokenizer
-from torch.utils.data import Dataset, DataLoader
+import torch.distributed as dist
+from torch.utils.data import Dataset, DataLoader, DistributedSampler
 
 
 LABEL_DICT = {}
@@ -170,7 +172,8 @@ def get_data_loader(args,
                     num_workers,
                     batch_size,
                     num_class,
-                    split='train'):
+                    split='train',
+                    bert=None):
     logging.info(f"loading {split} dataset")
     global LABEL_DICT
     LABEL_DICT = ALL_DICT[num_class[0]]
@@ -197,17 +200,31 @@ def get_data_loader(args,
         cls_idx=dataset.cls_idx,
         sep_idx=dataset.sep_idx,
         bert_args=torch.load(bert_args_path),
+        bert=bert,
         device='cpu'
     )
 
+    # splits are named train_XX / dev_XX; under DDP each process trains on
+    # its own shard of the training split
+    is_train = split.startswith('train')
+    sampler = None
+    if is_train and dist.is_available() and dist.is_initialized():
+        sampler = DistributedSampler(dataset, shuffle=True)
+
+    # a few persistent workers: more of them only contend for the GIL and IPC,
+    # and keeping them alive avoids re-forking every epoch
+    num_workers = min(num_workers, 8)
     return DataLoader(
         dataset=dataset,
-        shuffle=True if split == 'train' else False,
+        sampler=sampler,
+        shuffle=is_train and sampler is None,
         batch_size=batch_size,
         collate_fn=collate_fn,
         num_workers=num_workers,
+        persistent_workers=num_workers > 0,
+        prefetch_factor=4 if num_workers > 0 else None,
         pin_memory=True,
-        drop_last=True if split == 'train' else False
+        drop_last=False
     )
 
 
@@ -290,6 +307,7 @@ class AudioTextBatchFunction:
                  cls_idx,
                  sep_idx,
                  bert_args,
+                 bert=None,
                  device='cpu'):
         self.device = device
         self.only_audio = args.only_audio
@@ -302,6 +320,7 @@ class AudioTextBatchFunction:
         self.n_fft_size = args.n_fft_size
         self.sample_rate = args.sample_rate
         self.resample_rate = args.resample_rate
+        self.hop_length = self.n_fft_size // 2  # torchaudio default (win_length // 2)
 
         # text properties
         self.max_len_bert = bert_args.max_len
@@ -309,18 +328,9 @@ class AudioTextBatchFunction:
         self.cls_idx = cls_idx
         self.sep_idx = sep_idx
 
-        # audio feature extractor
-        if not self.only_text:
-            self.audio2mfcc = MFCC(
-                sample_rate=self.resample_rate,
-                n_mfcc=self.n_mfcc,
-                log_mels=False,
-                melkwargs={'n_fft': self.n_fft_size}
-            ).to(self.device)
-
         # text feature extractor
         if not self.only_audio:
-            self.bert = load_bert(args.bert_path, self.device)
+            self.bert = bert if bert is not None else load_bert(args.bert_path, self.device)
             self.bert.eval()
             self.bert.zero_grad()
 
@@ -337,9 +347,10 @@ class AudioTextBatchFunction:
                 text_emb, _ = self.bert(input_ids, text_masks)
 
             if not self.only_text:
-                audio_emb, audio_mask = self.pad_with_mfcc(audios)
+                audio_emb, audio_mask = self.pad_with_waveform(audios)
 
-        return audio_emb, audio_mask, text_emb, ~text_masks, torch.tensor(labels)
+        # labels are returned as a flat int64 vector, ready for CrossEntropyLoss
+        return audio_emb, audio_mask, text_emb, ~text_masks, torch.tensor(labels, dtype=torch.long)
 
     def _add_special_tokens(self, token_ids):
         return [self.cls_idx] + token_ids + [self.sep_idx]
@@ -366,31 +377,50 @@ class AudioTextBatchFunction:
                 break
         return audio[left:right + 1]
 
-    def pad_with_mfcc(self, audios):
-        #max_len = min(self.max_len_audio, max([len(audio) for audio in audios]))
+    def pad_with_waveform(self, audios):
+        """
+        MFCCs are extracted on the GPU by AudioFeatureExtractor,
+        so only resampling, trimming and padding of raw waveforms happen here.
+        The waveform length is chosen such that the MFCC has exactly max_len frames.
+        """
         max_len = self.max_len_audio
-        audio_array = torch.zeros(len(audios), self.n_mfcc, max_len).fill_(float('-inf'))
+        max_samples = (max_len - 1) * self.hop_length
+        audio_array = torch.zeros(len(audios), max_samples)
+        key_mask = torch.ones(len(audios), max_len, dtype=torch.bool)
         for idx, audio in enumerate(audios):
-            # resample and extract mfcc
+            # resample and trim
             audio = librosa.core.resample(audio, self.sample_rate, self.resample_rate)
-            mfcc = self.audio2mfcc(torch.tensor(self._trim(audio)).to(self.device))
-
-            # normalize
-            cur_mean, cur_std = mfcc.mean(dim=0), mfcc.std(dim=0)
-            mfcc = (mfcc - cur_mean) / cur_std
-
-            # save the extracted mfcc
-            cur_len = min(mfcc.shape[1], max_len)
-            audio_array[idx, :, :cur_len] = mfcc[:, :cur_len]
-
-        # (batch_size, n_mfcc, seq_len) -> (batch_size, seq_len, n_mfcc)
-        padded = audio_array.transpose(2, 1)
-
-        # get key mask
-        key_mask = padded[:, :, 0]
-        key_mask = key_mask.masked_fill(key_mask != float('-inf'), 0)
-        key_mask = key_mask.masked_fill(key_mask == float('-inf'), 1).bool()
-        
-        # -inf -> 0.0
-        padded = padded.masked_fill(padded == float('-inf'), 0.)
-        return padded, key_mask
+            audio = torch.tensor(self._trim(audio))[:max_samples]
+
+            # save the waveform and mask out the frames that come from padding
+            audio_array[idx, :len(audio)] = audio
+            cur_len = min(len(audio) // self.hop_length + 1, max_len)
+            key_mask[idx, :cur_len] = False
+        return audio_array, key_mask
+
+
+class AudioFeatureExtractor(nn.Module):
+    """ Batched MFCC extraction, run on the training device """
+
+    def __init__(self, args):
+        super(AudioFeatureExtractor, self).__init__()
+        self.audio2mfcc = MFCC(
+            sample_rate=args.resample_rate,
+            n_mfcc=args.n_mfcc,
+            log_mels=False,
+            melkwargs={'n_fft': args.n_fft_size}
+        )
+
+    @torch.no_grad()
+    def forward(self, waveforms, key_mask):
+        # (batch_size, n_samples) -> (batch_size, n_mfcc, seq_len)
+        # the channel axis keeps AmplitudeToDB's top_db floor per clip, not per batch
+        mfcc = self.audio2mfcc(waveforms.float().unsqueeze(1)).squeeze(1)
+
+        # normalize each frame over its coefficients
+        cur_mean, cur_std = mfcc.mean(dim=1, keepdim=True), mfcc.std(dim=1, keepdim=True)
+        mfcc = (mfcc - cur_mean) / cur_std
+
+        # (batch_size, n_mfcc, seq_len) -> (batch_size, seq_len, n_mfcc), padding -> 0.0
+        padded = mfcc.transpose(2, 1)
+        return padded.masked_fill(key_mask.unsqueeze(-1), 0.)
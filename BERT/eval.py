@@ -4,8 +4,9 @@ import logging
 from tqdm import tqdm
 import pandas as pd
 import os
+from contextlib import nullcontext
 from sklearn.metrics import classification_report, confusion_matrix
-from dataset import get_data_loader
+from dataset import get_data_loader, AudioFeatureExtractor
 from model import MultimodalTransformer
 
 label = {
@@ -20,7 +21,8 @@ label = {
 
 def evaluate(model,
              data_loader,
-             device, test_name, save_path, LABEL_DICT=label):
+             device, test_name, save_path, LABEL_DICT=label, audio2mfcc=None,
+             result_lock=None, show_progress=True):
     loss = 0
     y_true, y_pred = [], []
 
@@ -28,19 +30,25 @@ def evaluate(model,
     model.zero_grad()
     class_weights  = torch.FloatTensor([0.01,0.16,0.16,0.16,0.17,0.17,0.17]).to(device)
     loss_fct = torch.nn.CrossEntropyLoss()# weight=class_weights )#,3:0.16,4:0.17,5:0.17,6:0.17
-    iterator = tqdm(enumerate(data_loader), desc='eval_steps', total=len(data_loader))
-    for step, batch in iterator:
+    iterator = tqdm(data_loader, desc='eval_steps', total=len(data_loader),
+                    miniters=max(1, len(data_loader) // 100), disable=not show_progress)
+    for step, batch in enumerate(iterator):
         with torch.no_grad():
 
             # unpack and set inputs
-            batch = map(lambda x: x.to(device) if x is not None else x, batch)
             audios, a_mask, texts, t_mask, labels = batch
-            labels = labels.squeeze(-1).long()
+            audios = audios.to(device, non_blocking=True) if audios is not None else None
+            a_mask = a_mask.to(device, non_blocking=True) if a_mask is not None else None
+            texts = texts.to(device, non_blocking=True) if texts is not None else None
+            t_mask = t_mask.to(device, non_blocking=True) if t_mask is not None else None
+            labels = labels.to(device, non_blocking=True)
+            if audio2mfcc is not None:
+                audios = audio2mfcc(audios, a_mask)
             y_true += labels.tolist()
 
             # feed to model and get loss
             logit, hidden = model(audios, texts, a_mask, t_mask)
-            cur_loss = loss_fct(logit, labels.view(-1))
+            cur_loss = loss_fct(logit, labels)
             loss += cur_loss.item()
             y_pred += logit.max(dim=1)[1].tolist()
 
@@ -62,33 +70,35 @@ def evaluate(model,
     rec = report['weighted avg']['recall']
     loss /= len(data_loader)
     
-    #찬영
-    try:
-        df_result = pd.read_csv(os.path.join(save_path,'result.csv'))
-        df_Totalresult = pd.read_csv(os.path.join(save_path,'Totalresult.csv'))
-    except FileNotFoundError:
-        df_result = pd.DataFrame(columns=['label', 'f1-score', 'precision', 'recall'])
-        df_Totalresult = pd.DataFrame(columns=['label', 'f1-score', 'precision', 'recall'])
+    # sessions trained in parallel share the result csv files
+    with result_lock if result_lock is not None else nullcontext():
+        #찬영
+        try:
+            df_result = pd.read_csv(os.path.join(save_path,'result.csv'))
+            df_Totalresult = pd.read_csv(os.path.join(save_path,'Totalresult.csv'))
+        except FileNotFoundError:
+            df_result = pd.DataFrame(columns=['label', 'f1-score', 'precision', 'recall'])
+            df_Totalresult = pd.DataFrame(columns=['label', 'f1-score', 'precision', 'recall'])
         
-    df_result.loc[len(df_result)] = [ test_name + "TOTAL", f1, prec, rec]
-    df_Totalresult.loc[len(df_Totalresult)] = [ test_name + "TOTAL", f1, prec, rec]
-    #찬영
+        df_result.loc[len(df_result)] = [ test_name + "TOTAL", f1, prec, rec]
+        df_Totalresult.loc[len(df_Totalresult)] = [ test_name + "TOTAL", f1, prec, rec]
+        #찬영
         
-    # logging
-    log_template = "{}\tF1: {:.4f}\tPREC: {:.4f}\tREC: {:.4f}"
-    logging.info(log_template.format("TOTAL", f1, prec, rec))
-    for key, value in report.items():
-        if key in LABEL_DICT:
-            cur_f1 = value['f1-score']
-            cur_prec = value['precision']
-            cur_rec = value['recall']
-            df_result.loc[len(df_result)] = [ test_name + key, cur_f1, cur_prec, cur_rec]
+        # logging
+        log_template = "{}\tF1: {:.4f}\tPREC: {:.4f}\tREC: {:.4f}"
+        logging.info(log_template.format("TOTAL", f1, prec, rec))
+        for key, value in report.items():
+            if key in LABEL_DICT:
+                cur_f1 = value['f1-score']
+                cur_prec = value['precision']
+                cur_rec = value['recall']
+                df_result.loc[len(df_result)] = [ test_name + key, cur_f1, cur_prec, cur_rec]
             
-            logging.info(log_template.format(key, cur_f1, cur_prec, cur_rec))
-    logging.info('\n'+str(cm))
+                logging.info(log_template.format(key, cur_f1, cur_prec, cur_rec))
+        logging.info('\n'+str(cm))
     
-    df_result.to_csv(os.path.join(save_path, 'result.csv'), index=False)
-    df_Totalresult.to_csv(os.path.join(save_path, 'Totalresult.csv'), index=False)
+        df_result.to_csv(os.path.join(save_path, 'result.csv'), index=False)
+        df_Totalresult.to_csv(os.path.join(save_path, 'Totalresult.csv'), index=False)
     
     return loss, f1
 
@@ -114,13 +124,14 @@ def main(args):
         d_model=args.d_model,
         attn_mask=args.attn_mask
     ).to(args.device)
+    audio2mfcc = AudioFeatureExtractor(args).to(args.device) if not args.only_text else None
     save_point = torch.load(args.model_path)
     model.load_state_dict(save_point, strict=False)
 
     # evaluation
     logging.info('evaluation starts')
     model.zero_grad()
-    evaluate(model, data_loader, args.device)
+    evaluate(model, data_loader, args.device, audio2mfcc=audio2mfcc)
 
 
 if __name__ == "__main__":
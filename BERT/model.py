@@ -55,10 +55,15 @@ class TransformerBlock(nn.Module, ABC):
         """
         query, key, value = [self.layer_norm(x) for x in (query, key, value)]
         mask = self.get_future_mask(query, key) if attn_mask else None
+
+        # without attention weights, nn.MultiheadAttention dispatches to
+        # F.scaled_dot_product_attention, so the attention probabilities are not
+        # materialized; the merged padding/future float mask (B*H, L, S) still is
         x = self.self_attn(
             query, key, value,
             key_padding_mask=key_padding_mask,
-            attn_mask=mask)[0]
+            attn_mask=mask,
+            need_weights=False)[0]
         return query + self.dropout(x)
 
     @staticmethod
@@ -300,6 +305,13 @@ class MultimodalTransformer(nn.Module, ABC):
 
         return self.out_layer(out), features
 
+    def reset_classifier(self, n_classes):
+        """
+        Replace the output layer with a freshly initialized one,
+        so that the rest of the network can be reused for another label set.
+        """
+        self.out_layer = nn.Linear(self.out_layer.in_features, n_classes).to(self.out_layer.weight.device)
+
     @staticmethod
     def get_network(**kwargs):
         return CrossmodalTransformer(
@@ -3,53 +3,158 @@ import torch
 import logging
 import os
 import json
-from utils import set_seed, get_optimizer_and_scheduler
-from dataset import ALL_DICT, get_data_loader
-from model import MultimodalTransformer
+from types import MappingProxyType
+from contextlib import nullcontext
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.nn.parallel import DistributedDataParallel as DDP
+from utils import set_seed, get_optimizer_and_scheduler, is_main_process, save_state_dict_async
+from dataset import ALL_DICT, get_data_loader, AudioFeatureExtractor
+from model import MultimodalTransformer, load_bert
 from tqdm import tqdm
 from eval import evaluate
 
+# session -> (label dict of the session, number of classes)
+NUM_CLASS_DICT = MappingProxyType({
+    1: ("LABELDICT_B", 3), #LABELDICT_B = neutral, happy, surprise
+    2: ("LABELDICT_B", 3),  #LABELDICT_B = neutral, happy, surprise
+    3: ("LABELDICT_C", 6),  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    4: ("LABELDICT_C", 6),  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    5: ("LABELDICT_D", 7),  #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    6: ("LABELDICT_D", 7),  #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    7: ("LABELDICT_E", 5),  #LABELDICT_E = neutral, happy, angry, surprise, disqust
+    8: ("LABELDICT_C", 6),  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    9: ("LABELDICT_C", 6),  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    10: ("LABELDICT_D", 7),  #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    11: ("LABELDICT_F", 5), #LABELDICT_F = neutral, happy, surprise, sad, fear
+    12: ("LABELDICT_G", 6), #LABELDICT_G = neutral, happy, angry, surprise, sad, fear
+    13: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    14: ("LABELDICT_H", 6), #LABELDICT_H = neutral, happy, angry, disqust, sad, fear
+    15: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    16: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    17: ("LABELDICT_I", 5), #LABELDICT_I = neutral, happy, angry, surprise, sad
+    18: ("LABELDICT_Q", 5), #LABELDICT_Q" : ['disqust', 'fear', 'happy', 'neutral', 'sad']
+    19: ("LABELDICT_C", 6), #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    20: ("LABELDICT_I", 5), #LABELDICT_I = neutral, happy, angry, surprise, sad
+    21: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    22: ("LABELDICT_C", 6), #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    23: ("LABELDICT_E", 5), #LABELDICT_E = neutral, happy, angry, surprise, disqust
+    24: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    25: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    26: ("LABELDICT_G", 6), #LABELDICT_G = neutral, happy, angry, surprise, sad, fear
+    27: ("LABELDICT_C", 6), #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    28: ("LABELDICT_M", 5), #LABELDICT_M = neutral, happy, angry, surprise, fear
+    29: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+    30: ("LABELDICT_C", 6), #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    31: ("LABELDICT_B", 3), #LABELDICT_B = neutral, happy, surprise
+    32: ("LABELDICT_L", 4), #LABELDICT_L = neutral, happy, surprise, disqust
+    33: ("LABELDICT_N", 5), #LABELDICT_N = neutral, happy, surprise, disqust, fear
+    34: ("LABELDICT_M", 5), #LABELDICT_M = neutral, happy, angry, surprise, fear
+    35: ("LABELDICT_E", 5), #LABELDICT_E = neutral, happy, angry, surprise, disqust
+    36: ("LABELDICT_I", 5), #LABELDICT_I = neutral, happy, angry, surprise, sad
+    37: ("LABELDICT_R", 5), #LABELDICT_R: ('disqust', 'happy', 'neutral', 'sad', 'surprise')
+    38: ("LABELDICT_P", 4), #LABELDICT_B = neutral, happy, surprise, sad
+    39: ("LABELDICT_C", 6), #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
+    40: ("LABELDICT_D", 7), #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
+})
+
+
 def train(args,
           model,
           trn_loader,
           optimizer,
-          scheduler):
+          scheduler,
+          scaler,
+          audio2mfcc=None):
 
-    trn_loss, logging_loss = 0, 0
+    # running loss stays on the device; it is only synced when logging
+    trn_loss, logging_loss = torch.zeros((), device=args.device), 0
     loss_fct = torch.nn.CrossEntropyLoss()
-    iterator = tqdm(enumerate(trn_loader), desc='steps', total=len(trn_loader))
+    # progress bar only on rank 0 (none for parallel sessions), refreshed about 100 times per epoch
+    iterator = trn_loader if not args.show_progress or not is_main_process() else tqdm(
+        trn_loader, desc='steps', total=args.steps_per_epoch, miniters=max(1, args.steps_per_epoch // 100))
 
     # start steps
-    for step, batch in iterator:
+    for step, batch in enumerate(iterator):
         model.train()
-        model.zero_grad()
 
-        # unpack and set inputs
-        batch = map(lambda x: x.to(args.device) if x is not None else x, batch)
+        # unpack and set inputs (batches are pinned, so copies run asynchronously)
         audios, a_mask, texts, t_mask, labels = batch
-        labels = labels.squeeze(-1).long()
-
-        # feed to model and get loss
-        logit, hidden = model(audios, texts, a_mask, t_mask)
-        loss = loss_fct(logit, labels.view(-1))
-        trn_loss += loss.item()
+        audios = audios.to(args.device, non_blocking=True) if audios is not None else None
+        a_mask = a_mask.to(args.device, non_blocking=True) if a_mask is not None else None
+        texts = texts.to(args.device, non_blocking=True) if texts is not None else None
+        t_mask = t_mask.to(args.device, non_blocking=True) if t_mask is not None else None
+        labels = labels.to(args.device, non_blocking=True)
+        if audio2mfcc is not None:
+            audios = audio2mfcc(audios, a_mask)
+
+        # accumulate gradients locally and all-reduce only on the update step;
+        # the last batch always updates so no gradients outlive the epoch
+        update = (step + 1) % args.grad_accum_steps == 0 or step + 1 == args.steps_per_epoch
+        group_start = step - step % args.grad_accum_steps
+        group_size = min(args.grad_accum_steps, args.steps_per_epoch - group_start)
+        sync_ctx = model.no_sync() if args.distributed and not update else nullcontext()
+        with sync_ctx:
+
+            # feed to model and get loss
+            with torch.cuda.amp.autocast(enabled=args.fp16 or args.bf16, dtype=args.amp_dtype):
+                logit, hidden = model(audios, texts, a_mask, t_mask)
+                loss = loss_fct(logit, labels) / group_size
+            trn_loss += loss.detach()
+
+            # the scaler is a no-op unless fp16 is used
+            scaler.scale(loss).backward()
+
+        if not update:
+            continue
 
         # update the model
-        loss.backward()
+        scaler.unscale_(optimizer)
         torch.nn.utils.clip_grad_norm_(model.parameters(), args.clip)
-        optimizer.step()
+        scaler.step(optimizer)
+        scaler.update()
         scheduler.step()
+        optimizer.zero_grad(set_to_none=True)
         args.global_step += 1
 
         # summary
         if args.global_step % args.logging_steps == 0:
-            cur_logging_loss = (trn_loss - logging_loss) / args.logging_steps
+            cur_trn_loss = trn_loss.item()
+            cur_logging_loss = (cur_trn_loss - logging_loss) / args.logging_steps
             logging.info("train loss: {:.4f}".format(cur_logging_loss))
-            logging_loss = trn_loss
+            logging_loss = cur_trn_loss
+
+
+def build_model(args):
+    return MultimodalTransformer(
+        n_layers=args.n_layers,
+        n_heads=args.n_heads,
+        n_classes=args.n_classes,
+        only_audio=args.only_audio,
+        only_text=args.only_text,
+        d_audio_orig=args.n_mfcc,
+        d_text_orig=768,    # BERT hidden size
+        d_model=args.d_model,
+        attn_dropout=args.attn_dropout,
+        relu_dropout=args.relu_dropout,
+        emb_dropout=args.emb_dropout,
+        res_dropout=args.res_dropout,
+        out_dropout=args.out_dropout,
+        attn_mask=args.attn_mask
+    ).to(args.device)
+
 
+def main(args, sess, num_class, model, init_state, bert=None, audio2mfcc=None, result_lock=None):
+    # TF32 tensor cores for fp32 matmuls / convolutions (Ampere and newer)
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.set_float32_matmul_precision('high')
 
-def main(args, sess, num_class):
     set_seed(args.seed)
+
+    # batches are padded to fixed lengths, so cuDNN autotunes only for the full
+    # batch size and the one ragged last batch
+    torch.backends.cudnn.benchmark = True
     
     LABEL_DICT = ALL_DICT[num_class[0]]
 
@@ -61,54 +166,90 @@ def main(args, sess, num_class):
         batch_size=args.batch_size,
         num_workers=args.num_workers,
         num_class = num_class,
-        split=split
+        split=split,
+        bert=bert
     ) for split in ['train_'+f'{sess:02}', 'dev_'+f'{sess:02}'])
     
     trn_loader, dev_loader = loaders
     
-    # initialize model
-    model = MultimodalTransformer(
-        n_layers=args.n_layers,
-        n_heads=args.n_heads,
-        n_classes=num_class[1],#찬영
-        only_audio=args.only_audio,
-        only_text=args.only_text,
-        d_audio_orig=args.n_mfcc,
-        d_text_orig=768,    # BERT hidden size
-        d_model=args.d_model,
-        attn_dropout=args.attn_dropout,
-        relu_dropout=args.relu_dropout,
-        emb_dropout=args.emb_dropout,
-        res_dropout=args.res_dropout,
-        out_dropout=args.out_dropout,
-        attn_mask=args.attn_mask
-    ).to(args.device)
+    # initialize model: restore the shared initial weights, new head per session
+    model.load_state_dict(init_state, strict=False)
+    model.reset_classifier(num_class[1])#찬영
+
+    # keep the bare module for evaluation and checkpointing
+    base_model = model
+    if args.distributed:
+        model = DDP(model, device_ids=[args.local_rank], gradient_as_bucket_view=True)
+    if args.compile:
+        # batches are padded to fixed lengths; only the ragged last batch needs a second graph
+        model = torch.compile(model, mode='reduce-overhead', fullgraph=False)
 
     # warmup scheduling
-    args.total_steps = round(len(trn_loader) * args.epochs)
+    args.steps_per_epoch = len(trn_loader)
+    args.total_steps = -(-args.steps_per_epoch // args.grad_accum_steps) * args.epochs
     args.warmup_steps = round(args.total_steps * args.warmup_percent)
 
     # optimizer & scheduler
     optimizer, scheduler = get_optimizer_and_scheduler(args, model)
 
+    # mixed precision: bf16 has enough range to train without loss scaling
+    scaler = torch.cuda.amp.GradScaler(enabled=args.fp16)
+
     logging.info('training starts')
-    model.zero_grad()
+    optimizer.zero_grad(set_to_none=True)
     args.global_step = 0
     
-    for epoch in tqdm(range(1, args.epochs + 1), desc='epochs'):
+    for epoch in tqdm(range(1, args.epochs + 1), desc='epochs', disable=not args.show_progress or not is_main_process()):
         test_name = "Session" + str(sess) + "_epoch:" + str(epoch) + "_"
-        # training and evaluation steps
-        train(args, model, trn_loader, optimizer, scheduler)
-        loss, f1 = evaluate(model, dev_loader, args.device, test_name, args.save_path, LABEL_DICT)
+        if args.distributed:
+            trn_loader.sampler.set_epoch(epoch)
 
-        # save model
+        # training and evaluation steps
+        train(args, model, trn_loader, optimizer, scheduler, scaler, audio2mfcc)
+        if is_main_process():
+            loss, f1 = evaluate(base_model, dev_loader, args.device, test_name, args.save_path, LABEL_DICT, audio2mfcc,
+                                result_lock, args.show_progress)
+        if args.distributed:
+            dist.barrier()
+
+    # save the final model of the session, named after its last evaluation
+    if is_main_process():
         model_name = "epoch{}-loss{:.4f}-f1{:.4f}.".format(epoch, loss, f1)
         model_path = os.path.join(args.save_path, model_name)
-    torch.save(model.state_dict() , model_path + "Session" + str(sess) + '.pt')
+        save_state_dict_async(base_model.state_dict(), model_path + "Session" + str(sess) + '.pt')
     
     logging.info('training ended')
 
 
+def run_sessions(args, sessions, result_lock=None):
+    # text encoder and model are built once and reused by every session
+    bert = load_bert(args.bert_path, 'cpu') if not args.only_audio else None
+    model = build_model(args)
+    audio2mfcc = AudioFeatureExtractor(args).to(args.device) if not args.only_text else None
+    init_state = {
+        key: value.clone() for key, value in model.state_dict().items()
+        if not key.startswith('out_layer.')
+    }
+
+    for sess in sessions:
+        num_class = NUM_CLASS_DICT[sess]
+        main(args,sess,num_class,model,init_state,bert,audio2mfcc,result_lock)
+
+
+def session_worker(rank, args, queue, result_lock):
+    # one worker per GPU, each training whole sessions taken from the shared queue
+    torch.cuda.set_device(rank)
+    args.device = torch.device('cuda', rank)
+    args.show_progress = False  # bars from several workers would interleave
+    logging.basicConfig(
+        format=f"%(asctime)s - %(levelname)s - %(name)s - [gpu{rank}] %(message)s",
+        datefmt="%m/%d/%Y %H:%M:%S",
+        level=logging.INFO
+    )
+    set_seed(args.seed)
+    run_sessions(args, iter(queue.get, None), result_lock)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
 
@@ -119,10 +260,12 @@ if __name__ == "__main__":
     parser.add_argument('--bert_path', type=str, default='./KoBERT')
     parser.add_argument('--save_path', type=str, default='./result') # 현재 코드 실행시 결과 파일이 교체됨 확인 후 실행 바람
     parser.add_argument('--n_classes', type=int, default=7)
-    parser.add_argument('--logging_steps', type=int, default=1)
+    parser.add_argument('--logging_steps', type=int, default=1) # loss is read back from the GPU only when logging; >1 avoids a sync per step
     parser.add_argument('--seed', type=int, default=1)
-    parser.add_argument('--num_workers', type=int, default=20)
+    parser.add_argument('--num_workers', type=int, default=8)
     parser.add_argument('--cuda', default='cuda')
+    parser.add_argument('--cuda_sync_debug', action='store_true')
+    parser.add_argument('--parallel_sessions', action='store_true')
 
     # dropouts
     parser.add_argument('--attn_dropout', type=float, default=.3)
@@ -142,7 +285,11 @@ if __name__ == "__main__":
     parser.add_argument('--epochs', type=int, default=5)
     parser.add_argument('--batch_size', type=int, default=128)
     parser.add_argument('--clip', type=float, default=.8)
+    parser.add_argument('--grad_accum_steps', type=int, default=1)
     parser.add_argument('--warmup_percent', type=float, default=.1)
+    parser.add_argument('--fp16', action='store_true')
+    parser.add_argument('--bf16', action='store_true')
+    parser.add_argument('--compile', action='store_true')
 
     # data processing
     parser.add_argument('--max_len_audio', type=int, default=400)
@@ -159,17 +306,43 @@ if __name__ == "__main__":
     if args_.only_audio and args_.only_text:
         raise ValueError("Please check your usage of modalities.")
 
+    # check usage of parallelism
+    if args_.parallel_sessions and 'LOCAL_RANK' in os.environ:
+        raise ValueError("--parallel_sessions cannot be combined with torchrun (DDP).")
+    if args_.parallel_sessions and torch.cuda.device_count() == 0:
+        raise ValueError("--parallel_sessions needs at least one visible GPU.")
+
+    # check usage of gradient accumulation
+    if args_.grad_accum_steps < 1:
+        raise ValueError("--grad_accum_steps must be at least 1.")
+
+    # check usage of mixed precision
+    if args_.fp16 and args_.bf16:
+        raise ValueError("Please choose only one of --fp16 and --bf16.")
+
     # save config
-    with open(os.path.join(args_.save_path, 'config.json'), 'w') as fp:
-        json.dump(args_.__dict__, fp, indent=4)
+    if int(os.environ.get('RANK', 0)) == 0:
+        with open(os.path.join(args_.save_path, 'config.json'), 'w') as fp:
+            json.dump(args_.__dict__, fp, indent=4)
 
     # seed and device setting
     set_seed(args_.seed)
     os.environ["CUDA_VISIBLE_DEVICES"] = "0,1,2"
-    os.environ['CUDA_LAUNCH_BLOCKING'] = "1"
-
-    device = torch.device('cuda:1' if torch.cuda.is_available() else 'cpu')
+    if args_.cuda_sync_debug:
+        os.environ['CUDA_LAUNCH_BLOCKING'] = "1"
+
+    # launched by torchrun -> one process per GPU
+    args_.distributed = 'LOCAL_RANK' in os.environ
+    if args_.distributed:
+        args_.local_rank = int(os.environ['LOCAL_RANK'])
+        dist.init_process_group('nccl')
+        torch.cuda.set_device(args_.local_rank)
+        device = torch.device('cuda', args_.local_rank)
+    else:
+        device = torch.device('cuda:1' if torch.cuda.is_available() else 'cpu')
     args_.device = device
+    args_.amp_dtype = torch.bfloat16 if args_.bf16 else torch.float16
+    args_.show_progress = True
 
     # log setting
     logger = logging.getLogger(__name__)
@@ -178,51 +351,22 @@ if __name__ == "__main__":
         datefmt="%m/%d/%Y %H:%M:%S",
         level=logging.INFO
     )
-    NUM_CLASS_DICT = { 1: ["LABELDICT_B", 3], #LABELDICT_B = neutral, happy, surprise
-                   2: ["LABELDICT_B", 3],  #LABELDICT_B = neutral, happy, surprise
-                   3: ["LABELDICT_C", 6],  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   4: ["LABELDICT_C", 6],  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   5: ["LABELDICT_D", 7],  #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   6: ["LABELDICT_D", 7],  #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   7: ["LABELDICT_E", 5],  #LABELDICT_E = neutral, happy, angry, surprise, disqust
-                   8: ["LABELDICT_C", 6],  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   9: ["LABELDICT_C", 6],  #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   10: ["LABELDICT_D", 7],  #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   11: ["LABELDICT_F", 5], #LABELDICT_F = neutral, happy, surprise, sad, fear
-                   12: ["LABELDICT_G", 6], #LABELDICT_G = neutral, happy, angry, surprise, sad, fear
-                   13: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   14: ["LABELDICT_H", 6], #LABELDICT_H = neutral, happy, angry, disqust, sad, fear
-                   15: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   16: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   17: ["LABELDICT_I", 5], #LABELDICT_I = neutral, happy, angry, surprise, sad
-                   18: ["LABELDICT_Q", 5], #LABELDICT_Q" : ['disqust', 'fear', 'happy', 'neutral', 'sad']
-                   19: ["LABELDICT_C", 6], #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   20: ["LABELDICT_I", 5], #LABELDICT_I = neutral, happy, angry, surprise, sad
-                   21: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   22: ["LABELDICT_C", 6], #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   23: ["LABELDICT_E", 5], #LABELDICT_E = neutral, happy, angry, surprise, disqust
-                   24: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   25: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   26: ["LABELDICT_G", 6], #LABELDICT_G = neutral, happy, angry, surprise, sad, fear
-                   27: ["LABELDICT_C", 6], #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   28: ["LABELDICT_M", 5], #LABELDICT_M = neutral, happy, angry, surprise, fear
-                   29: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                   30: ["LABELDICT_C", 6], #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   31: ["LABELDICT_B", 3], #LABELDICT_B = neutral, happy, surprise
-                   32: ["LABELDICT_L", 4], #LABELDICT_L = neutral, happy, surprise, disqust
-                   33: ["LABELDICT_N", 5], #LABELDICT_N = neutral, happy, surprise, disqust, fear
-                   34: ["LABELDICT_M", 5], #LABELDICT_M = neutral, happy, angry, surprise, fear
-                   35: ["LABELDICT_E", 5], #LABELDICT_E = neutral, happy, angry, surprise, disqust
-                   36: ["LABELDICT_I", 5], #LABELDICT_I = neutral, happy, angry, surprise, sad
-                   37: ["LABELDICT_R", 5], #LABELDICT_R: ('disqust', 'happy', 'neutral', 'sad', 'surprise')
-                   38: ["LABELDICT_P", 4], #LABELDICT_B = neutral, happy, surprise, sad
-                   39: ["LABELDICT_C", 6], #LABELDICT_C = neutral, happy, angry, surprise, disqust, sad
-                   40: ["LABELDICT_D", 7], #LABELDICT_D = neutral, happy, angry, surprise, disqust, sad, fear
-                  }
-
-    for sess in range(1,41):
-        num_class = NUM_CLASS_DICT[sess]
-        main(args_,sess,num_class)
+
+    if args_.parallel_sessions:
+        # sessions are independent: train them concurrently, one process per GPU
+        ctx = mp.get_context('spawn')
+        n_gpus = torch.cuda.device_count()
+        queue = ctx.Queue()
+        for sess in range(1,41):
+            queue.put(sess)
+        for _ in range(n_gpus):
+            queue.put(None)
+        mp.spawn(session_worker, args=(args_, queue, ctx.Lock()), nprocs=n_gpus)
+    else:
+        run_sessions(args_, range(1,41))
+
+    if args_.distributed:
+        dist.destroy_process_group()
         
     #LABELDICT_A = neutral, happy, angry, surprise
     #LABELDICT_B = neutral, happy, surprise
@@ -241,6 +385,7 @@ if __name__ == "__main__":
     #
 
 
+# multi-GPU: torchrun --nproc_per_node=3 train.py [same arguments]
 # python trainch.py \
 #   --data_path='./data' \
 #   --bert_path='./KoBERT' \
@@ -1,8 +1,10 @@
 import pickle
 import random
+import threading
 import torch
 import json
 import numpy as np
+import torch.distributed as dist
 from torch.optim.lr_scheduler import LambdaLR
 from transformers import AdamW
 
@@ -13,6 +15,19 @@ def set_seed(seed):
     torch.manual_seed(seed)
 
 
+def is_main_process():
+    return not (dist.is_available() and dist.is_initialized()) or dist.get_rank() == 0
+
+
+def save_state_dict_async(state_dict, path):
+    # copy to host first (a real copy even on CPU) so the live parameters
+    # can be updated or reset while the file is written
+    cpu_state = {key: value.detach().to('cpu', copy=True) for key, value in state_dict.items()}
+    thread = threading.Thread(target=torch.save, args=(cpu_state, path))
+    thread.start()
+    return thread
+
+
 def load_pkl(path):
     with open(path, 'rb') as f:
         return pickle.load(f)